@@ -0,0 +1,839 @@
+"""Azure Blob Storage backed cache for GitHub API responses.
+
+Payloads are stored as JSON blobs in a single container; expiry metadata
+travels on the blob itself so maintenance jobs can reason about entries
+without downloading them.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    orjson = None
+
+try:
+    import msgspec.msgpack
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    zstandard = None
+
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceExistsError,
+    ResourceNotFoundError,
+    ResourceNotModifiedError,
+)
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600
+
+# Short TTL for cached negative (None) results, when a caller opts in.
+NEGATIVE_TTL = 300
+
+# Persisted in place of None for negative entries; ``get`` uses None as
+# its miss sentinel, so a bare null blob could never register as a hit.
+_NEGATIVE = {'__negative__': True}
+
+# Payloads above this size are zstd-compressed before upload; level 3
+# costs well under a millisecond at these sizes and cuts JSON ~3x.
+_COMPRESS_THRESHOLD = 8192
+
+# Payloads above this size are downloaded chunk-wise instead of readall().
+_STREAM_THRESHOLD = 1_048_576
+
+# Compact per-key index kept alongside the cache blobs so statistics do
+# not need to enumerate the whole container.
+_INDEX_BLOB = '__index__.json'
+
+# Characters that may not appear in blob-name key segments.
+_KEY_SAFE = str.maketrans({'/': '_', ' ': '_', '\\': '_', ':': '_'})
+
+# create_container has been attempted in this process (one attempt per
+# process lifetime, shared across CacheManager instances).
+_CONTAINER_INITIALIZED = False
+
+
+def _json_default(obj):
+    """Map types orjson rejects (tuples, sets) onto lists."""
+    if isinstance(obj, (tuple, set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _dumps(obj):
+    """Serialize to compact JSON bytes, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(raw):
+    """Parse JSON from bytes/str, via orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _iso_timestamp(value):
+    """Normalize an epoch int or datetime to an ISO-8601 string."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return datetime.fromtimestamp(value).isoformat()
+
+
+class _LocalCache:
+    """Small thread-safe TTL + LRU map used as L1 in front of blob storage."""
+
+    def __init__(self, maxsize=512, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                # Evict the coldest 10% in one sweep so a full cache does
+                # not pay a per-insert eviction on every subsequent set.
+                for _ in range(max(1, self.maxsize // 10)):
+                    self._data.popitem(last=False)
+
+    def get_stale(self, key):
+        """Return a value even past its TTL, without evicting it."""
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item is not None else None
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class CacheManager:
+    """Persistent cache on Azure Blob Storage with TTL-based expiry."""
+
+    def __init__(self, container_name=None):
+        self.container_name = container_name or os.environ.get(
+            'CACHE_CONTAINER_NAME', 'portfolio-cache'
+        )
+        self.blob_service_client = None
+        self.container_client = None
+        self._save_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix='cache-save'
+        )
+        # Deletes are pure I/O; 32 workers stays within the transport's
+        # connection pool so urllib3 never logs pool-full warnings.
+        self._delete_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=32, thread_name_prefix='cache-delete'
+        )
+        # Known-present blob names, populated once in the background so
+        # negative lookups can skip the Azure round trip entirely.
+        self._present = None
+        self._present_extra = set()
+        self._present_loading = False
+        self._present_lock = threading.Lock()
+        # L1: repeated lookups within a short window never leave the process.
+        self._local = _LocalCache(maxsize=512, ttl=60)
+        # Blob ETag + metadata remembered per key so re-reads after local
+        # expiry can be answered by a 304 instead of a body download.
+        self._blob_meta = {}
+        # In-flight decorator misses, so a wave of identical requests only
+        # fires the wrapped function (and the blob write) once.
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Container existence is settled once at init; admin calls must not
+        # pay a HEAD request to re-verify it.
+        self._container_verified = False
+        # Connecting to Azure is deferred to first use so importing this
+        # module (and everything that imports it) stays off the network —
+        # cold starts must not block on create_container.
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _ensure_init(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            try:
+                self._init_cache()
+            finally:
+                self._initialized = True
+
+    def _init_cache(self):
+        """Connect to the storage account and ensure the container exists."""
+        connection_string = os.environ.get('AzureWebJobsStorage')
+        if not connection_string:
+            logger.warning("AzureWebJobsStorage not configured; cache disabled")
+            return
+        # Default urllib3 pools are too small for concurrent cache ops and
+        # cause connection churn under parallel decorator usage.
+        self.blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string,
+            transport=RequestsTransport(connection_pool_maxsize=64),
+            retry_total=3,
+            retry_backoff_factor=0.5,
+        )
+        self.container_client = self.blob_service_client.get_container_client(
+            self.container_name
+        )
+        global _CONTAINER_INITIALIZED
+        if not _CONTAINER_INITIALIZED:
+            # Deployments that pre-provision the container can set
+            # CACHE_CONTAINER_READY to skip this round-trip entirely;
+            # otherwise it runs once per process, not once per instance.
+            if os.environ.get('CACHE_CONTAINER_READY') != '1':
+                try:
+                    self.container_client.create_container()
+                except ResourceExistsError:
+                    pass
+            _CONTAINER_INITIALIZED = True
+        self._container_verified = True
+
+    @property
+    def enabled(self):
+        self._ensure_init()
+        return self.blob_service_client is not None
+
+    def _mark_present(self, cache_key):
+        self._present_extra.add(cache_key)
+        if self._present is not None:
+            self._present.add(cache_key)
+
+    def _mark_absent(self, cache_key):
+        self._local.pop(cache_key)
+        self._blob_meta.pop(cache_key, None)
+        self._present_extra.discard(cache_key)
+        if self._present is not None:
+            self._present.discard(cache_key)
+
+    def _known_missing(self, cache_key):
+        """True when the key set is loaded and the key is definitely absent."""
+        present = self._present
+        if present is None:
+            with self._present_lock:
+                if not self._present_loading:
+                    self._present_loading = True
+                    self._save_pool.submit(self._populate_present)
+            return False
+        return cache_key not in present and cache_key not in self._present_extra
+
+    def _populate_present(self):
+        """One names-only listing to seed the known-present key set."""
+        try:
+            names = {blob.name for blob in self.container_client.list_blobs()}
+        except Exception as e:
+            logger.warning(f"Could not populate key set: {e}")
+            with self._present_lock:
+                self._present_loading = False
+            return
+        self._present = names
+
+    @staticmethod
+    def _is_expired(metadata, now_epoch):
+        """Decide expiry from blob metadata using the cheap epoch compare.
+
+        Falls back to parsing the ISO ``expires_at`` only for legacy blobs
+        written before ``expires_at_epoch`` existed.
+        """
+        epoch = metadata.get('expires_at_epoch')
+        if epoch is not None:
+            try:
+                return int(epoch) <= now_epoch
+            except ValueError:
+                pass
+        expires_at = metadata.get('expires_at')
+        if not expires_at:
+            return False
+        return datetime.fromisoformat(expires_at).timestamp() <= now_epoch
+
+    def generate_cache_key(self, prefix, *args):
+        """Build a cache key from a prefix and identifying arguments."""
+        parts = [prefix]
+        for arg in args:
+            parts.append(str(arg).translate(_KEY_SAFE))
+        return '/'.join(parts)
+
+    def save(self, cache_key, data, ttl=DEFAULT_TTL, no_expiry=False,
+             fingerprint=None, etag=None):
+        """Store ``data`` under ``cache_key`` with the given TTL in seconds.
+
+        When the caller supplies a content ``fingerprint`` and it matches
+        the stored blob, only the expiry metadata is refreshed — the
+        payload is not re-uploaded.
+        """
+        if not self.enabled:
+            return False
+        metadata = {'cached_at': datetime.now().isoformat()}
+        if etag:
+            metadata['etag'] = etag
+        if no_expiry:
+            metadata['no_expiry'] = 'True'
+        elif ttl is not None:
+            expires_at = datetime.now() + timedelta(seconds=ttl)
+            metadata['expires_at'] = expires_at.isoformat()
+            metadata['expires_at_epoch'] = str(int(time.time()) + int(ttl))
+        try:
+            blob_client = self.container_client.get_blob_client(cache_key)
+            if fingerprint is not None:
+                metadata['fingerprint'] = fingerprint
+                try:
+                    existing = blob_client.get_blob_properties()
+                    existing_meta = existing.metadata or {}
+                    if existing_meta.get('fingerprint') == fingerprint:
+                        # Unchanged content: extend the TTL without
+                        # re-sending the payload.
+                        blob_client.set_blob_metadata({**existing_meta, **metadata})
+                        self._mark_present(cache_key)
+                        self._local.set(cache_key, data)
+                        self._save_pool.submit(
+                            self._update_index,
+                            cache_key,
+                            {
+                                'size': existing.size or 0,
+                                'expires_at_epoch': metadata.get('expires_at_epoch'),
+                                'last_modified': int(time.time()),
+                            },
+                        )
+                        return True
+                except ResourceNotFoundError:
+                    pass
+            if msgspec is not None:
+                # Binary framing: no string escaping or UTF-8 validation on
+                # the wire, and smaller payloads than JSON text.
+                payload = msgspec.msgpack.encode(data)
+                metadata['format'] = 'msgpack'
+                content_type = 'application/msgpack'
+            else:
+                payload = _dumps(data)
+                content_type = 'application/json'
+            content_encoding = None
+            if len(payload) > _COMPRESS_THRESHOLD:
+                if zstandard is not None:
+                    payload = zstandard.ZstdCompressor(level=3).compress(payload)
+                    metadata['zstd'] = 'True'
+                    content_encoding = 'zstd'
+                else:
+                    # Level 1 is ~3x faster than the default and nearly
+                    # as small on JSON-shaped payloads.
+                    payload = gzip.compress(payload, compresslevel=1)
+                    metadata['gzip'] = 'True'
+                    content_encoding = 'gzip'
+            blob_client.upload_blob(
+                payload,
+                overwrite=True,
+                metadata=metadata,
+                max_concurrency=2,
+                content_settings=ContentSettings(
+                    content_type=content_type,
+                    content_encoding=content_encoding,
+                    # Lets any HTTP-aware intermediary (CDN, proxy) cache
+                    # the blob for exactly the entry's lifetime.
+                    cache_control=(
+                        f'max-age={int(ttl)}'
+                        if not no_expiry and ttl is not None else None
+                    ),
+                ),
+            )
+            self._mark_present(cache_key)
+            self._local.set(cache_key, data)
+            self._save_pool.submit(
+                self._update_index,
+                cache_key,
+                {
+                    'size': len(payload),
+                    'expires_at_epoch': metadata.get('expires_at_epoch'),
+                    'last_modified': int(time.time()),
+                },
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Cache save failed for {cache_key}: {e}")
+            return False
+
+    def get(self, cache_key):
+        """Return the cached value for ``cache_key`` or None on miss/expiry."""
+        if not self.enabled:
+            return None
+        local = self._local.get(cache_key)
+        if local is not None:
+            return local
+        if self._known_missing(cache_key):
+            return None
+        try:
+            entry = self._get_blob_entry(cache_key)
+            if entry is None:
+                return None
+            data, metadata, expired = entry
+            if expired:
+                try:
+                    self.container_client.get_blob_client(cache_key).delete_blob()
+                except ResourceNotFoundError:
+                    pass
+                self._mark_absent(cache_key)
+                self._save_pool.submit(self._update_index, cache_key, None)
+                return None
+            if data is not None:
+                self._local.set(cache_key, data)
+            return data
+        except Exception as e:
+            logger.error(f"Cache get failed for {cache_key}: {e}")
+            return None
+
+    def get_many(self, cache_keys):
+        """Fetch several entries at once; returns {key: value-or-None}.
+
+        Blob storage has no multi-get, so misses on the local layer fan
+        out across a thread pool — one round-trip of wall-clock instead
+        of one per key. Fetched values land in the local cache, so an
+        immediately following per-key ``get`` is a memory hit. Expired
+        entries are read with stale semantics: their stored body and
+        ETag survive for conditional revalidation instead of being
+        deleted as ``get`` would.
+        """
+        results = {}
+        pending = []
+        for key in cache_keys:
+            local = self._local.get(key)
+            if local is not None:
+                results[key] = local
+            else:
+                results[key] = None
+                pending.append(key)
+        if not pending or not self.enabled:
+            return results
+
+        def _read(key):
+            entry = self.get_stale(key)
+            if entry is None:
+                return None
+            data, _etag, fresh = entry
+            return data if fresh else None
+
+        workers = min(16, len(pending))
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='cache-mget') as pool:
+            for key, value in zip(pending, pool.map(_read, pending)):
+                results[key] = value
+        return results
+
+    def get_stale(self, cache_key):
+        """Return ``(data, etag, fresh)`` for an entry even after expiry.
+
+        Lets callers revalidate stale data upstream (e.g. via conditional
+        requests) instead of discarding it. Returns None on a true miss.
+        """
+        if not self.enabled:
+            return None
+        local = self._local.get(cache_key)
+        if local is not None:
+            return local, None, True
+        if self._known_missing(cache_key):
+            return None
+        try:
+            entry = self._get_blob_entry(cache_key, read_stale=True)
+        except Exception as e:
+            logger.error(f"Cache get failed for {cache_key}: {e}")
+            return None
+        if entry is None:
+            return None
+        data, metadata, expired = entry
+        if not expired and data is not None:
+            self._local.set(cache_key, data)
+        return data, metadata.get('etag'), not expired
+
+    def touch(self, cache_key, ttl=DEFAULT_TTL):
+        """Extend an entry's expiry without rewriting its payload."""
+        if not self.enabled:
+            return False
+        try:
+            blob_client = self.container_client.get_blob_client(cache_key)
+            metadata = dict(blob_client.get_blob_properties().metadata or {})
+            expires_at = datetime.now() + timedelta(seconds=ttl)
+            metadata['expires_at'] = expires_at.isoformat()
+            metadata['expires_at_epoch'] = str(int(time.time()) + int(ttl))
+            blob_client.set_blob_metadata(metadata)
+            return True
+        except ResourceNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Cache touch failed for {cache_key}: {e}")
+            return False
+
+    def _get_blob_entry(self, cache_key, read_stale=False):
+        """Download one entry as ``(data, metadata, expired)`` or None.
+
+        One request serves properties and body; an expired blob's body is
+        only read when ``read_stale`` asks for it (``data`` is None then).
+        """
+        blob_client = self.container_client.get_blob_client(cache_key)
+        remembered = self._blob_meta.get(cache_key)
+        stale_local = self._local.get_stale(cache_key) if remembered else None
+        try:
+            if remembered is not None and stale_local is not None:
+                # We still hold the decoded value from the last download;
+                # ask Azure to send the body only if the blob changed.
+                blob_etag, blob_metadata = remembered
+                try:
+                    downloader = blob_client.download_blob(
+                        max_concurrency=2,
+                        etag=blob_etag,
+                        match_condition=MatchConditions.IfModified,
+                    )
+                except ResourceNotModifiedError:
+                    expired = blob_metadata.get('no_expiry') != 'True' and \
+                        self._is_expired(blob_metadata, int(time.time()))
+                    if expired and not read_stale:
+                        return None, blob_metadata, True
+                    return stale_local, blob_metadata, expired
+            else:
+                # max_concurrency lets the SDK pull later ranges of a
+                # large blob in parallel; single-chunk blobs are unaffected.
+                downloader = blob_client.download_blob(max_concurrency=2)
+        except ResourceNotFoundError:
+            return None
+        properties = downloader.properties
+        metadata = properties.metadata or {}
+        expired = metadata.get('no_expiry') != 'True' and self._is_expired(
+            metadata, int(time.time())
+        )
+        if expired and not read_stale:
+            return None, metadata, True
+        if (properties.size or 0) > _STREAM_THRESHOLD:
+            # Accumulate chunk-by-chunk so peak memory tracks the chunk
+            # size, not the blob size, for multi-MB bundles.
+            buf = bytearray()
+            for chunk in downloader.chunks():
+                buf.extend(chunk)
+            raw = bytes(buf)
+        else:
+            raw = downloader.readall()
+        if metadata.get('zstd') == 'True':
+            if zstandard is None:
+                raise RuntimeError(
+                    f"Blob {cache_key} is zstd-compressed but zstandard "
+                    "is not installed"
+                )
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        elif metadata.get('gzip') == 'True':
+            raw = gzip.decompress(raw)
+        if metadata.get('format') == 'msgpack':
+            data = msgspec.msgpack.decode(raw)
+        else:
+            data = _loads(raw)
+            # Blobs written before cached_at moved into metadata carry a
+            # {'data': ..., 'cached_at': ...} wrapper; unwrap them.
+            if isinstance(data, dict) and set(data) == {'data', 'cached_at'}:
+                data = data['data']
+        if len(self._blob_meta) > 1024:
+            self._blob_meta.clear()
+        self._blob_meta[cache_key] = (properties.etag, metadata)
+        return data, metadata, expired
+
+    def delete(self, cache_key):
+        """Remove a cache entry; returns True if a blob was deleted."""
+        if not self.enabled:
+            return False
+        try:
+            blob_client = self.container_client.get_blob_client(cache_key)
+            blob_client.delete_blob()
+            self._mark_absent(cache_key)
+            self._save_pool.submit(self._update_index, cache_key, None)
+            return True
+        except ResourceNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Cache delete failed for {cache_key}: {e}")
+            return False
+
+    def _update_index(self, cache_key, entry):
+        """Upsert (or remove, when ``entry`` is None) one index record."""
+        self._apply_index_changes({cache_key: entry})
+
+    def _apply_index_changes(self, changes):
+        """Merge ``changes`` (key -> record, None removes) into the index.
+
+        The index blob is rewritten with an ETag precondition so concurrent
+        writers cannot clobber each other; on contention we re-read and retry.
+        """
+        index_client = self.container_client.get_blob_client(_INDEX_BLOB)
+        for _ in range(3):
+            try:
+                try:
+                    downloader = index_client.download_blob()
+                    index = _loads(downloader.readall())
+                    etag = downloader.properties.etag
+                except ResourceNotFoundError:
+                    index, etag = {}, None
+                for cache_key, entry in changes.items():
+                    if entry is None:
+                        index.pop(cache_key, None)
+                    else:
+                        index[cache_key] = entry
+                kwargs = {'overwrite': True}
+                if etag:
+                    kwargs['etag'] = etag
+                    kwargs['match_condition'] = MatchConditions.IfNotModified
+                index_client.upload_blob(_dumps(index), **kwargs)
+                return
+            except HttpResponseError:
+                continue
+        logger.warning("Index update gave up after retries")
+
+    def _read_index(self):
+        """Return the index dict, or None when it has not been built yet."""
+        try:
+            raw = self.container_client.get_blob_client(_INDEX_BLOB).download_blob().readall()
+            return _loads(raw)
+        except ResourceNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Index read failed: {e}")
+            return None
+
+    def cache_decorator(self, cache_key_func, ttl=DEFAULT_TTL, cache_none=False,
+                        is_method=True):
+        """Cache the wrapped function's result under a derived key.
+
+        ``cache_key_func`` receives exactly the wrapped call's arguments
+        and returns the cache key; with ``is_method=False`` the leading
+        bound instance is stripped for key functions written without a
+        ``self`` parameter. None results (missing upstream resources) are
+        not persisted unless ``cache_none`` is set, and then only with a
+        short negative TTL.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if is_method:
+                    cache_key = cache_key_func(*args, **kwargs)
+                else:
+                    cache_key = cache_key_func(*args[1:], **kwargs)
+                cached = self.get(cache_key)
+                if cached is not None:
+                    return None if cached == _NEGATIVE else cached
+                with self._inflight_lock:
+                    event = self._inflight.get(cache_key)
+                    producer = event is None
+                    if producer:
+                        event = threading.Event()
+                        self._inflight[cache_key] = event
+                if not producer:
+                    event.wait()
+                    return event.result
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    event.result = None
+                    with self._inflight_lock:
+                        self._inflight.pop(cache_key, None)
+                    event.set()
+                    raise
+                # Don't block the caller on the Azure PUT; persist off-path.
+                if result is not None:
+                    self._save_pool.submit(self.save, cache_key, result, ttl=ttl)
+                elif cache_none:
+                    self._save_pool.submit(
+                        self.save, cache_key, _NEGATIVE, ttl=NEGATIVE_TTL
+                    )
+                event.result = result
+                with self._inflight_lock:
+                    self._inflight.pop(cache_key, None)
+                event.set()
+                return result
+            return wrapper
+        return decorator
+
+    def close(self):
+        """Drain pending background work and release the worker pools."""
+        self._delete_pool.shutdown(wait=True)
+        self._save_pool.shutdown(wait=True)
+
+    def cleanup_expired_cache(self, dry_run=False):
+        """Delete expired cache blobs; returns summary counters."""
+        if not self.enabled:
+            return {'status': 'disabled'}
+        if not self._container_verified:
+            return {'status': 'no_container'}
+        totals = {'scanned': 0, 'expired': 0, 'deleted': 0, 'errors': 0}
+        # Let the service page at its native size and treat each page as a
+        # batch, instead of re-batching the iterator by hand.
+        pages = self.container_client.list_blobs(
+            include=['metadata'], results_per_page=5000
+        ).by_page()
+        for page in pages:
+            self._process_cleanup_batch(list(page), totals, dry_run)
+        logger.info(f"Cache cleanup finished: {totals}")
+        return totals
+
+    def _process_cleanup_batch(self, batch, totals, dry_run):
+        """Check one batch of listed blobs for expiry and delete as needed.
+
+        Listing already carries metadata, so non-expiring blobs are skipped
+        before any per-blob client work and a delete is the only per-blob
+        request ever issued.
+        """
+        now_epoch = int(time.time())
+        expired_names = []
+        for blob in batch:
+            if blob.name == _INDEX_BLOB:
+                continue
+            totals['scanned'] += 1
+            metadata = blob.metadata or {}
+            if metadata.get('no_expiry') == 'True':
+                continue
+            try:
+                if self._is_expired(metadata, now_epoch):
+                    expired_names.append(blob.name)
+            except ValueError:
+                totals['errors'] += 1
+        totals['expired'] += len(expired_names)
+        if dry_run or not expired_names:
+            return
+        deleted_names = []
+        can_batch = hasattr(self.container_client, 'delete_blobs')
+        # Azure accepts up to 256 deletes per batch request.
+        for start in range(0, len(expired_names), 256):
+            chunk = expired_names[start:start + 256]
+            if can_batch:
+                try:
+                    # Sub-request failures come back as responses instead
+                    # of aborting the whole multipart request.
+                    responses = self.container_client.delete_blobs(
+                        *chunk, raise_on_any_failure=False
+                    )
+                    for name, response in zip(chunk, responses):
+                        # 404 means another worker got there first.
+                        if response.status_code in (202, 404):
+                            self._mark_absent(name)
+                            totals['deleted'] += 1
+                            deleted_names.append(name)
+                        else:
+                            totals['errors'] += 1
+                    continue
+                except Exception as e:
+                    logger.warning(
+                        f"Batch delete failed, retrying per blob: {e}"
+                    )
+            for name, ok in zip(
+                chunk, self._delete_pool.map(self._delete_expired, chunk)
+            ):
+                if ok:
+                    totals['deleted'] += 1
+                    deleted_names.append(name)
+                else:
+                    totals['errors'] += 1
+        if deleted_names:
+            self._save_pool.submit(
+                self._apply_index_changes, {name: None for name in deleted_names}
+            )
+
+    def _delete_expired(self, name):
+        try:
+            self.container_client.delete_blob(name)
+        except ResourceNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to delete expired blob {name}: {e}")
+            return False
+        self._mark_absent(name)
+        return True
+
+    def get_cache_statistics(self):
+        """Summarize cache contents: entry counts, sizes, and age range."""
+        if not self.enabled:
+            return {'status': 'disabled'}
+        if not self._container_verified:
+            return {'status': 'no_container'}
+        index = self._read_index()
+        if index is not None:
+            counter = collections.Counter(
+                key.partition('/')[0] for key in index
+            )
+            timestamps = [
+                entry['last_modified']
+                for entry in index.values()
+                if entry.get('last_modified')
+            ]
+            return {
+                'total_entries': len(index),
+                'total_size_bytes': sum(
+                    entry.get('size', 0) for entry in index.values()
+                ),
+                'entries_by_type': dict(counter),
+                'oldest_entry': _iso_timestamp(min(timestamps, default=None)),
+                'newest_entry': _iso_timestamp(max(timestamps, default=None)),
+            }
+        # No index yet: fall back to a full listing and rebuild it.
+        counter = collections.Counter()
+        rebuilt = {}
+        total_entries = 0
+        total_size = 0
+        oldest = None
+        newest = None
+        for blob in self.container_client.list_blobs(
+            include=['metadata'], results_per_page=5000
+        ):
+            if blob.name == _INDEX_BLOB:
+                continue
+            total_entries += 1
+            total_size += blob.size or 0
+            counter[blob.name.partition('/')[0]] += 1
+            modified = blob.last_modified
+            if modified is not None:
+                if oldest is None or modified < oldest:
+                    oldest = modified
+                if newest is None or modified > newest:
+                    newest = modified
+            metadata = blob.metadata or {}
+            rebuilt[blob.name] = {
+                'size': blob.size or 0,
+                'expires_at_epoch': metadata.get('expires_at_epoch'),
+                'last_modified': int(modified.timestamp()) if modified else None,
+            }
+        self._save_pool.submit(self._apply_index_changes, rebuilt)
+        return {
+            'total_entries': total_entries,
+            'total_size_bytes': total_size,
+            'entries_by_type': dict(counter),
+            'oldest_entry': _iso_timestamp(oldest),
+            'newest_entry': _iso_timestamp(newest),
+        }
+
+
+cache_manager = CacheManager()
@@ -0,0 +1,68 @@
+"""HTTP entry points for the portfolio API."""
+
+import json
+import logging
+
+import azure.functions as func
+
+from cache_manager import cache_manager
+from github_repo_manager import GitHubRepoManager
+
+logger = logging.getLogger(__name__)
+
+app = func.FunctionApp(http_auth_level=func.AuthLevel.ANONYMOUS)
+
+repo_manager = GitHubRepoManager()
+
+
+@app.route(route="health", methods=["GET"])
+def health(req: func.HttpRequest) -> func.HttpResponse:
+    return func.HttpResponse(
+        json.dumps({'status': 'ok', 'cache_enabled': cache_manager.enabled}),
+        mimetype='application/json',
+    )
+
+
+@app.route(route="repos", methods=["GET"])
+def repos(req: func.HttpRequest) -> func.HttpResponse:
+    username = req.params.get('username')
+    result = repo_manager.get_all_repos_with_context_graphql(username)
+    return func.HttpResponse(
+        json.dumps(result, default=str),
+        mimetype='application/json',
+    )
+
+
+@app.route(route="repos/{repo}", methods=["GET"])
+def repo_detail(req: func.HttpRequest) -> func.HttpResponse:
+    repo = req.route_params.get('repo')
+    result = repo_manager.get_repo_metadata(req.params.get('username'), repo)
+    if result is None:
+        return func.HttpResponse(
+            json.dumps({'error': 'repository not found'}),
+            status_code=404,
+            mimetype='application/json',
+        )
+    return func.HttpResponse(
+        json.dumps(result, default=str),
+        mimetype='application/json',
+    )
+
+
+@app.route(route="cache/stats", methods=["GET"])
+def cache_stats(req: func.HttpRequest) -> func.HttpResponse:
+    stats = cache_manager.get_cache_statistics()
+    return func.HttpResponse(
+        json.dumps(stats, default=str),
+        mimetype='application/json',
+    )
+
+
+@app.route(route="cache/cleanup", methods=["POST"])
+def cache_cleanup(req: func.HttpRequest) -> func.HttpResponse:
+    dry_run = req.params.get('dry_run', '').lower() == 'true'
+    result = cache_manager.cleanup_expired_cache(dry_run=dry_run)
+    return func.HttpResponse(
+        json.dumps(result, default=str),
+        mimetype='application/json',
+    )
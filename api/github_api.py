@@ -0,0 +1,531 @@
+"""GitHub REST API client with blob-backed response caching."""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    orjson = None
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    httpx = None
+
+from cache_manager import cache_manager
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = 'https://api.github.com'
+
+# Request-cache keys: req/<METHOD>/<blake2b-8 of endpoint+params>.
+# Fixed-length hashed names keep blob listings fast, and the '/'
+# delimiter lets prefix scans isolate request caches from other entries.
+_REQUEST_PREFIX = 'req'
+
+# The HTTP/2 client for the current asyncio.run scope. A contextvar
+# (rather than an instance attribute) keeps concurrent invocations in
+# separate threads from sharing a client across two live loops.
+_ASYNC_CLIENT = contextvars.ContextVar('github_async_client', default=None)
+
+
+def _hash_request_key(method, endpoint, params_items, variant=''):
+    """Hash one request's identity into a fixed-length cache key."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(endpoint.encode('utf-8'))
+    if variant:
+        # Accept variants (raw text vs. the JSON contents envelope)
+        # return different body shapes for the same URL; keep the cache
+        # entries apart so neither caller is served the other's shape.
+        digest.update(variant.encode('utf-8'))
+    if params_items:
+        # Canonicalize with sorted keys so insertion order cannot split
+        # the cache; orjson sorts in native code and emits bytes.
+        if orjson is not None:
+            digest.update(
+                orjson.dumps(dict(params_items), option=orjson.OPT_SORT_KEYS)
+            )
+        else:
+            digest.update(
+                json.dumps(dict(params_items), sort_keys=True).encode('utf-8')
+            )
+    return f'{_REQUEST_PREFIX}/{method}/{digest.hexdigest()}'
+
+
+# Hot endpoints repeat the same (method, endpoint, params) triples, so
+# the serialize-and-hash work is memoized on the frozen param items.
+_hashed_request_key = lru_cache(maxsize=4096)(_hash_request_key)
+
+
+def _parse_body(response, accept_raw=False):
+    """Decode a response body, preferring orjson's native-code parser.
+
+    orjson parses straight from the bytes buffer, skipping the text
+    decode that ``response.json()`` performs first.
+    """
+    if accept_raw:
+        return response.text
+    if 'json' not in response.headers.get('Content-Type', ''):
+        return response.text
+    try:
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def _handle_ok(api, response, accept_raw, cache_key, cache_ttl, stale_data):
+    result = _parse_body(response, accept_raw)
+    if cache_key is not None:
+        api.cache.save(
+            cache_key,
+            result,
+            ttl=cache_ttl,
+            etag=response.headers.get('ETag'),
+        )
+    return result, dict(response.headers)
+
+
+def _handle_not_modified(api, response, accept_raw, cache_key, cache_ttl,
+                         stale_data):
+    if stale_data is None:
+        # Nothing cached to serve; let the caller's retry loop decide.
+        return None
+    # Upstream unchanged: extend the cached entry's TTL in place and
+    # serve the stale body.
+    api.cache.touch(cache_key, ttl=cache_ttl)
+    return stale_data, dict(response.headers)
+
+
+def _handle_not_found(api, response, accept_raw, cache_key, cache_ttl,
+                      stale_data):
+    return None, {}
+
+
+def _handle_unauthorized(api, response, accept_raw, cache_key, cache_ttl,
+                         stale_data):
+    logger.error("GitHub authentication failed; check GITHUB_TOKEN")
+    return None, {}
+
+
+# Terminal statuses dispatch through one dict probe instead of an
+# if/elif cascade; rate-limit and 5xx statuses stay in the retry loop.
+_STATUS_HANDLERS = {
+    200: _handle_ok,
+    304: _handle_not_modified,
+    401: _handle_unauthorized,
+    404: _handle_not_found,
+}
+
+
+def parse_next_link(link_header):
+    """Extract the rel="next" URL from a Link header, or None."""
+    if not link_header:
+        return None
+    for part in link_header.split(','):
+        url, _, rel = part.partition(';')
+        if 'rel="next"' in rel:
+            return url.strip().strip('<>')
+    return None
+
+
+def parse_last_page(link_header):
+    """Extract the rel="last" page number from a Link header, or None."""
+    if not link_header:
+        return None
+    for part in link_header.split(','):
+        url, _, rel = part.partition(';')
+        if 'rel="last"' in rel:
+            match = re.search(r'[?&]page=(\d+)', url)
+            if match:
+                return int(match.group(1))
+    return None
+
+
+class GitHubAPI:
+    """Thin facade over the GitHub REST API with response caching."""
+
+    def __init__(self, token=None, username=None):
+        self.token = token or os.environ.get('GITHUB_TOKEN')
+        self.username = username or os.environ.get('GITHUB_USERNAME', 'yungryce')
+        self.cache = cache_manager
+        self.headers = {
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': 'portfolio-api',
+        }
+        if self.token:
+            self.headers['Authorization'] = f'token {self.token}'
+        # Concurrent misses for the same cache key share one request.
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Header-driven pacing state, updated from every response.
+        self._rl_lock = threading.Lock()
+        self._rl_remaining = None
+        self._rl_reset = 0
+        # Persistent session: keep-alive reuses the TLS connection to
+        # api.github.com across calls instead of handshaking every time.
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        self._session.mount(
+            'https://',
+            HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=64,
+                # Transient failures retry inside urllib3 (C-backed, honors
+                # Retry-After); Python-level code only handles GitHub's
+                # nonstandard rate-limit semantics.
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[500, 502, 503, 504],
+                    respect_retry_after_header=True,
+                    allowed_methods=frozenset(['GET', 'HEAD']),
+                ),
+            ),
+        )
+
+    def generate_request_cache_key(self, method, endpoint, params=None,
+                                   accept_raw=False):
+        """Fixed-length hierarchical cache key for one request."""
+        variant = 'raw' if accept_raw else ''
+        if not params:
+            return _hashed_request_key(method.upper(), endpoint, (), variant)
+        try:
+            return _hashed_request_key(
+                method.upper(), endpoint, tuple(sorted(params.items())),
+                variant,
+            )
+        except TypeError:
+            # Unhashable param values cannot be memoized; hash directly.
+            return _hash_request_key(
+                method.upper(), endpoint, tuple(params.items()), variant
+            )
+
+    def _update_rate_limit(self, headers):
+        """Record the rate-limit budget advertised by a response."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None:
+            return
+        with self._rl_lock:
+            try:
+                self._rl_remaining = int(remaining)
+                if reset:
+                    self._rl_reset = int(reset)
+            except ValueError:
+                pass
+
+    def _throttle_delay(self):
+        """Seconds to pause before the next request, from the advertised budget.
+
+        Near exhaustion the delay grows proportionally so bursts taper
+        off instead of slamming into the hard limit and eating 403
+        retries.
+        """
+        with self._rl_lock:
+            remaining, reset = self._rl_remaining, self._rl_reset
+        if remaining is None:
+            return 0
+        if remaining <= 1:
+            wait = max(0, reset - int(time.time()))
+            if wait:
+                logger.warning(f"Rate limit exhausted; sleeping {wait}s")
+                return min(wait, 60)
+        elif remaining < 50:
+            window = max(1, reset - int(time.time()))
+            return min(window / remaining, 2)
+        return 0
+
+    def _throttle(self):
+        """Pace outbound requests against the advertised budget."""
+        delay = self._throttle_delay()
+        if delay:
+            time.sleep(delay)
+
+    def make_request(self, method, endpoint, params=None, accept_raw=False,
+                     cache_ttl=3600, retries=3, return_headers=False):
+        """Issue one API request, serving cacheable GETs from the blob cache.
+
+        Returns the decoded JSON body (or raw text with ``accept_raw``),
+        or None for missing resources and exhausted retries. With
+        ``return_headers`` the result is a ``(body, headers)`` tuple;
+        cache hits carry empty headers.
+        """
+        if endpoint.startswith('http'):
+            # Absolute URL, e.g. a Link rel="next" target.
+            url = endpoint
+        else:
+            url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
+        cache_key = None
+        stale_data = stale_etag = None
+        if method.upper() == 'GET' and cache_ttl:
+            cache_key = self.generate_request_cache_key(
+                method, endpoint, params, accept_raw
+            )
+            entry = self.cache.get_stale(cache_key)
+            if entry is not None:
+                data, etag, fresh = entry
+                if fresh:
+                    return (data, {}) if return_headers else data
+                # Expired but revalidatable: keep the body around and ask
+                # GitHub whether it changed. 304s carry no body and do not
+                # count against the rate limit.
+                stale_data, stale_etag = data, etag
+        request_headers = dict(self.headers)
+        if accept_raw:
+            request_headers['Accept'] = 'application/vnd.github.raw'
+        if stale_etag and stale_data is not None:
+            request_headers['If-None-Match'] = stale_etag
+        # Singleflight: concurrent misses for one key ride on the first
+        # caller's request instead of each spending rate-limit budget.
+        coalesce = cache_key is not None and stale_data is None
+        if coalesce:
+            with self._inflight_lock:
+                future = self._inflight.get(cache_key)
+                if future is None:
+                    self._inflight[cache_key] = concurrent.futures.Future()
+            if future is not None:
+                result = future.result()
+                return (result, {}) if return_headers else result
+        try:
+            result, headers = self._issue_request(
+                method, url, endpoint, params, request_headers,
+                accept_raw, cache_key, cache_ttl, retries,
+                stale_data,
+            )
+        except BaseException:
+            if coalesce:
+                with self._inflight_lock:
+                    future = self._inflight.pop(cache_key, None)
+                if future is not None:
+                    future.set_result(None)
+            raise
+        if coalesce:
+            with self._inflight_lock:
+                future = self._inflight.pop(cache_key, None)
+            if future is not None:
+                future.set_result(result)
+        return (result, headers) if return_headers else result
+
+    def _issue_request(self, method, url, endpoint, params, request_headers,
+                       accept_raw, cache_key, cache_ttl, retries, stale_data):
+        """Issue one wire-level request; returns ``(body, headers)``.
+
+        Connection errors and transient 5xx responses are retried inside
+        urllib3 by the session adapter's Retry policy before this method
+        ever sees them. Only GitHub's nonstandard rate-limit responses
+        (403/429 with X-RateLimit-* headers) are retried here, since
+        their wait times come from response headers.
+        """
+        backoff = 1
+        for attempt in range(retries):
+            self._throttle()
+            try:
+                response = self._session.request(
+                    method=method,
+                    url=url,
+                    headers=request_headers,
+                    params=params,
+                    timeout=30,
+                )
+            except requests.RequestException as e:
+                # The adapter has already exhausted its retries.
+                logger.warning(f"Request to {endpoint} failed: {e}")
+                return None, {}
+            self._update_rate_limit(response.headers)
+            handler = _STATUS_HANDLERS.get(response.status_code)
+            if handler is not None:
+                outcome = handler(
+                    self, response, accept_raw, cache_key, cache_ttl,
+                    stale_data,
+                )
+                if outcome is not None:
+                    return outcome
+                # 304 with nothing cached: refetch without the validator.
+                request_headers.pop('If-None-Match', None)
+                continue
+            if response.status_code in (403, 429):
+                retry_after = response.headers.get('Retry-After')
+                reset = response.headers.get('X-RateLimit-Reset')
+                if retry_after:
+                    # Secondary rate limit: the server says exactly how
+                    # long to stay away; add jitter to avoid a thundering
+                    # herd of synchronized retries.
+                    wait = int(retry_after)
+                    logger.warning(f"Retry-After {wait}s for {endpoint}")
+                    time.sleep(min(wait, 60) + random.uniform(0, 0.25 * backoff))
+                elif reset and response.headers.get('X-RateLimit-Remaining') == '0':
+                    wait = max(0, int(reset) - int(time.time()))
+                    logger.warning(f"Rate limited; reset in {wait}s")
+                    time.sleep(min(wait, 60))
+                else:
+                    time.sleep(backoff + random.uniform(0, 0.25 * backoff))
+                    backoff *= 2
+                continue
+            logger.warning(
+                f"GitHub returned {response.status_code} for {endpoint}"
+            )
+            return None, {}
+        return None, {}
+
+    def graphql(self, query, variables=None):
+        """POST one GraphQL query; returns the ``data`` payload or None."""
+        if not self.token:
+            # The GraphQL endpoint rejects anonymous requests outright.
+            return None
+        self._throttle()
+        try:
+            response = self._session.post(
+                f'{GITHUB_API_URL}/graphql',
+                json={'query': query, 'variables': variables or {}},
+                timeout=30,
+            )
+        except requests.RequestException as e:
+            logger.warning(f"GraphQL request failed: {e}")
+            return None
+        self._update_rate_limit(response.headers)
+        if response.status_code != 200:
+            logger.warning(f"GraphQL returned {response.status_code}")
+            return None
+        body = response.json()
+        if body.get('errors'):
+            logger.warning(f"GraphQL errors: {body['errors'][:3]}")
+            return None
+        return body.get('data')
+
+    @contextlib.asynccontextmanager
+    async def async_client(self):
+        """Scope an HTTP/2 client to the surrounding ``asyncio.run`` call.
+
+        Every ``asyncio.run`` tears its event loop down on exit; a client
+        reused across runs keeps pooled connections bound to the closed
+        loop and fails each subsequent batch. The client therefore lives
+        exactly as long as the loop that owns it.
+        """
+        if httpx is None:
+            raise RuntimeError("httpx is required for async requests")
+        client = httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            timeout=30,
+            limits=httpx.Limits(max_connections=32),
+        )
+        token = _ASYNC_CLIENT.set(client)
+        try:
+            yield client
+        finally:
+            _ASYNC_CLIENT.reset(token)
+            await client.aclose()
+
+    async def make_request_async(self, method, endpoint, params=None,
+                                 accept_raw=False, cache_ttl=3600, retries=3):
+        """Async variant of make_request for fan-out fetches.
+
+        Multiple awaited calls multiplex over one HTTP/2 connection, so a
+        batch completes in roughly the latency of its slowest member.
+        Must run inside an ``async_client`` scope. Mirrors the sync
+        path's resilience: responses feed the shared rate-limit pacing
+        state, stale entries revalidate with If-None-Match, and 403/429
+        responses wait out Retry-After instead of failing the batch.
+        """
+        client = _ASYNC_CLIENT.get()
+        if client is None:
+            raise RuntimeError(
+                "make_request_async requires an async_client scope"
+            )
+        cache_key = None
+        stale_data = stale_etag = None
+        if method.upper() == 'GET' and cache_ttl:
+            cache_key = self.generate_request_cache_key(
+                method, endpoint, params, accept_raw
+            )
+            entry = self.cache.get_stale(cache_key)
+            if entry is not None:
+                data, etag, fresh = entry
+                if fresh:
+                    return data
+                stale_data, stale_etag = data, etag
+        headers = {}
+        if accept_raw:
+            headers['Accept'] = 'application/vnd.github.raw'
+        if stale_etag and stale_data is not None:
+            headers['If-None-Match'] = stale_etag
+        url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
+        backoff = 1
+        for attempt in range(retries):
+            delay = self._throttle_delay()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                response = await client.request(
+                    method, url, params=params, headers=headers or None
+                )
+            except httpx.HTTPError as e:
+                logger.warning(f"Async request to {endpoint} failed: {e}")
+                return None
+            self._update_rate_limit(response.headers)
+            if response.status_code == 304:
+                if stale_data is not None:
+                    if cache_key is not None:
+                        self.cache._save_pool.submit(
+                            self.cache.touch, cache_key, cache_ttl
+                        )
+                    return stale_data
+                # 304 with nothing cached: refetch without the validator.
+                headers.pop('If-None-Match', None)
+                continue
+            if response.status_code == 404:
+                return None
+            if response.status_code in (403, 429):
+                retry_after = response.headers.get('Retry-After')
+                reset = response.headers.get('X-RateLimit-Reset')
+                if retry_after:
+                    wait = int(retry_after)
+                    logger.warning(f"Retry-After {wait}s for {endpoint}")
+                    await asyncio.sleep(
+                        min(wait, 60) + random.uniform(0, 0.25 * backoff)
+                    )
+                elif reset and response.headers.get('X-RateLimit-Remaining') == '0':
+                    wait = max(0, int(reset) - int(time.time()))
+                    logger.warning(f"Rate limited; reset in {wait}s")
+                    await asyncio.sleep(min(wait, 60))
+                else:
+                    await asyncio.sleep(
+                        backoff + random.uniform(0, 0.25 * backoff)
+                    )
+                    backoff *= 2
+                continue
+            if response.status_code != 200:
+                logger.warning(
+                    f"GitHub returned {response.status_code} for {endpoint}"
+                )
+                return None
+            result = _parse_body(response, accept_raw)
+            if cache_key is not None:
+                self.cache._save_pool.submit(
+                    self.cache.save,
+                    cache_key,
+                    result,
+                    ttl=cache_ttl,
+                    etag=response.headers.get('ETag'),
+                )
+            return result
+        # Retries exhausted on rate limiting; a stale body beats nothing.
+        return stale_data
@@ -0,0 +1,244 @@
+"""Fetch and decode repository files through the GitHub contents API."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    # SIMD-accelerated base64; a drop-in for the stdlib decoder.
+    from pybase64 import b64decode
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    from base64 import b64decode
+
+from cache_manager import cache_manager
+
+logger = logging.getLogger(__name__)
+
+# Documentation container files, hoisted so directory walks don't rebuild
+# the sets per call.
+_BASE_FILES = frozenset({'README.md', '.repo-context.json', 'ARCHITECTURE.md'})
+_ROOT_FILES = _BASE_FILES | {'SKILLS-INDEX.md'}
+_SUBDIR_FILES = _BASE_FILES | {'PROJECT-MANIFEST.md'}
+
+# Extensions always consumed as text; fetching them raw skips the
+# base64 envelope and its decode entirely.
+_TEXT_EXTENSIONS = ('.md', '.json', '.txt')
+
+
+class GitHubFileManager:
+    """File and directory access for repositories, cached per path."""
+
+    def __init__(self, api):
+        self.api = api
+
+    @cache_manager.cache_decorator(
+        lambda self, username=None, repo=None, path='', raw=False: cache_manager.generate_cache_key(
+            'file_content', username or self.api.username, repo, path
+        ),
+        ttl=3600,
+        cache_none=True,
+    )
+    def get_file_content(self, username=None, repo=None, path='', raw=False):
+        """Return a file's text, or the directory listing for a dir path.
+
+        With ``raw`` the request asks for ``application/vnd.github.raw``
+        and returns the body directly, skipping the base64 round-trip of
+        the contents envelope.
+        """
+        username = username or self.api.username
+        endpoint = f'repos/{username}/{repo}/contents/{path}'
+        if raw or path.endswith(_TEXT_EXTENSIONS):
+            return self.api.make_request('GET', endpoint, accept_raw=True)
+        result = self.api.make_request('GET', endpoint)
+        if isinstance(result, dict) and 'content' in result:
+            return self._decode_file_content(username, repo, result)
+        return result
+
+    @cache_manager.cache_decorator(
+        lambda self, username=None, repo=None, path='': cache_manager.generate_cache_key(
+            'directory_list', username or self.api.username, repo, path
+        ),
+        ttl=3600,
+    )
+    def list_directory(self, username=None, repo=None, path=''):
+        """Return the entry names of a directory."""
+        username = username or self.api.username
+        endpoint = f'repos/{username}/{repo}/contents/{path}'
+        result = self.api.make_request('GET', endpoint)
+        if isinstance(result, list):
+            return [item.get('name') for item in result if isinstance(item, dict)]
+        return []
+
+    async def get_file_content_async(self, username, repo, path='', raw=False):
+        """Async counterpart of get_file_content."""
+        endpoint = f'repos/{username}/{repo}/contents/{path}'
+        if raw or path.endswith(_TEXT_EXTENSIONS):
+            return await self.api.make_request_async(
+                'GET', endpoint, accept_raw=True
+            )
+        result = await self.api.make_request_async('GET', endpoint)
+        if isinstance(result, dict) and 'content' in result:
+            return self._decode_file_content(username, repo, result)
+        return result
+
+    def get_many_files(self, username, repo, paths):
+        """Fetch several files concurrently; returns {path: content}.
+
+        With httpx available the fetches multiplex over one HTTP/2
+        connection and complete in O(slowest); otherwise they fall back to
+        sequential requests.
+        """
+        try:
+            results = asyncio.run(self._gather_files(username, repo, paths))
+        except RuntimeError:
+            # No httpx, or already inside an event loop: fetch serially.
+            results = [self.get_file_content(username, repo, p) for p in paths]
+        return dict(zip(paths, results))
+
+    async def _gather_files(self, username, repo, paths):
+        async with self.api.async_client():
+            return await asyncio.gather(
+                *(self.get_file_content_async(username, repo, p) for p in paths)
+            )
+
+    def _decode_file_content(self, username, repo, item):
+        """Decode the base64 ``content`` field of a contents response."""
+        try:
+            return b64decode(item['content']).decode('utf-8')
+        except Exception:
+            # Oversized or malformed inline content: refetch raw.
+            return self._fetch_individual_file(username, repo, item.get('path'))
+
+    def _fetch_individual_file(self, username, repo, path):
+        """Fetch one file's content, decoding or falling back to raw."""
+        endpoint = f'repos/{username}/{repo}/contents/{path}'
+        if path and path.endswith(_TEXT_EXTENSIONS):
+            raw = self.api.make_request('GET', endpoint, accept_raw=True)
+            if isinstance(raw, str):
+                return raw
+        result = self.api.make_request('GET', endpoint)
+        if isinstance(result, dict) and result.get('content'):
+            try:
+                return b64decode(result['content']).decode('utf-8')
+            except Exception:
+                pass
+        raw = self.api.make_request('GET', endpoint, accept_raw=True)
+        return raw if isinstance(raw, str) else None
+
+    def _process_directory_files(self, username, repo, path='', is_repo_root=True):
+        """Collect the documentation container files of one directory."""
+        container_files = _ROOT_FILES if is_repo_root else _SUBDIR_FILES
+        endpoint = f'repos/{username}/{repo}/contents/{path}'
+        listing = self.api.make_request('GET', endpoint)
+        found_files = {}
+        files_needing_fetch = []
+        for item in listing or []:
+            if not isinstance(item, dict):
+                continue
+            name = item.get('name')
+            if name not in container_files:
+                continue
+            if item.get('content'):
+                found_files[name] = self._decode_file_content(username, repo, item)
+            else:
+                # Listing entries rarely inline content; fetch individually.
+                files_needing_fetch.append(item)
+        if len(files_needing_fetch) > 1:
+            # One GraphQL POST can carry every pending file as an aliased
+            # blob expression, replacing N REST round-trips.
+            batched = self._fetch_container_files_graphql(
+                username, repo,
+                [item.get('path') for item in files_needing_fetch],
+            )
+            if batched is not None:
+                for item in files_needing_fetch:
+                    content = batched.get(item.get('path'))
+                    if content:
+                        found_files[item['name']] = content
+                return found_files
+        if len(files_needing_fetch) == 1:
+            item = files_needing_fetch[0]
+            content = self._fetch_individual_file(username, repo, item.get('path'))
+            if content:
+                found_files[item['name']] = content
+        elif files_needing_fetch:
+            # Independent round-trips; requests releases the GIL during
+            # I/O, so the batch completes in ~one fetch's latency.
+            workers = min(8, len(files_needing_fetch))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(
+                        self._fetch_individual_file, username, repo, item.get('path')
+                    ): item['name']
+                    for item in files_needing_fetch
+                }
+                for future in as_completed(futures):
+                    content = future.result()
+                    if content:
+                        found_files[futures[future]] = content
+        return found_files
+
+    def _fetch_container_files_graphql(self, username, repo, paths):
+        """Fetch several files' text in one GraphQL request.
+
+        Returns {path: text} for the files that exist, or None when
+        GraphQL is unavailable so callers can fall back to REST.
+        """
+        fields = ' '.join(
+            f'f{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+            for i, path in enumerate(paths)
+        )
+        query = (
+            'query($owner: String!, $name: String!) {'
+            f' repository(owner: $owner, name: $name) {{ {fields} }} }}'
+        )
+        data = self.api.graphql(query, {'owner': username, 'name': repo})
+        repository = (data or {}).get('repository')
+        if repository is None:
+            return None
+        return {
+            path: repository[f'f{i}']['text']
+            for i, path in enumerate(paths)
+            if repository.get(f'f{i}')
+            and repository[f'f{i}'].get('text') is not None
+        }
+
+    def get_repository_tree(self, username, repo, path=''):
+        """Return every file path in the repository under ``path``.
+
+        One git/trees call with ``recursive=1`` replaces the per-directory
+        contents recursion, so the whole tree costs a single request.
+        Trees GitHub truncates (>100k entries) fall back to the recursive
+        walk, which has no entry cap.
+        """
+        tree = self.api.make_request(
+            'GET',
+            f'repos/{username}/{repo}/git/trees/HEAD',
+            params={'recursive': '1'},
+        )
+        if isinstance(tree, dict) and not tree.get('truncated'):
+            prefix = f'{path}/' if path else ''
+            return [
+                entry['path']
+                for entry in tree.get('tree') or []
+                if isinstance(entry, dict)
+                and entry.get('type') == 'blob'
+                and (not prefix or entry.get('path', '').startswith(prefix))
+            ]
+        return self._walk_tree(username, repo, path)
+
+    def _walk_tree(self, username, repo, path=''):
+        """Recursive contents-API walk; fallback for truncated trees."""
+        endpoint = f'repos/{username}/{repo}/contents/{path}'
+        listing = self.api.make_request('GET', endpoint)
+        paths = []
+        for item in listing or []:
+            if not isinstance(item, dict):
+                continue
+            if item.get('type') == 'file':
+                paths.append(item.get('path'))
+            elif item.get('type') == 'dir':
+                paths.extend(
+                    self._walk_tree(username, repo, item.get('path'))
+                )
+        return paths
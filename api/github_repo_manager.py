@@ -0,0 +1,525 @@
+"""Repository metadata aggregation over the GitHub API."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dev boxes without the wheel
+    orjson = None
+
+from cache_manager import cache_manager
+from concurrent.futures import ThreadPoolExecutor
+
+from github_api import GitHubAPI, parse_last_page
+from github_file_manager import GitHubFileManager
+
+logger = logging.getLogger(__name__)
+
+if orjson is not None:
+    _JSON_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError)
+else:
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+
+def _parse_context(raw):
+    """Parse a .repo-context.json payload; returns {} on bad JSON."""
+    try:
+        if orjson is not None:
+            return orjson.loads(raw if isinstance(raw, bytes) else raw.encode())
+        return json.loads(raw)
+    except _JSON_ERRORS:
+        return {}
+
+
+# Hoisted so trim_processed_repo iterates ~17 wanted keys instead of
+# scanning the ~100 fields of a raw GitHub repo object per call.
+_KEYS_TO_KEEP = frozenset([
+    'id', 'name', 'full_name', 'description', 'html_url', 'language',
+    'languages', 'stargazers_count', 'forks_count', 'topics',
+    'created_at', 'updated_at', 'pushed_at', 'size', 'fork',
+    'repoContext', 'file_paths',
+])
+_MISSING = object()
+
+
+def _compile_trimmer():
+    """Generate a straight-line trimmer specialized to _KEYS_TO_KEEP.
+
+    Unrolling the key loop at import time turns the per-repo trim into
+    a fixed sequence of single dict probes — no iteration, no repeated
+    membership tests. Runs once per repo in every bundle build, so the
+    one-off exec pays for itself quickly.
+    """
+    lines = ['def _trim(r, _MISSING=_MISSING):', '    get = r.get', '    out = {}']
+    for key in sorted(_KEYS_TO_KEEP):
+        lines.append(f'    v = get({key!r}, _MISSING)')
+        lines.append(f'    if v is not _MISSING:')
+        lines.append(f'        out[{key!r}] = v')
+    lines.append('    return out')
+    namespace = {'_MISSING': _MISSING}
+    exec('\n'.join(lines), namespace)
+    return namespace['_trim']
+
+
+_trim = _compile_trimmer()
+
+
+def _extract_file_paths(root_files):
+    """Root-listing paths as a tuple — immutable and lighter than a list.
+
+    Exact-type check plus a walrus-bound .get keeps this to two dict
+    operations per entry; contents entries are always plain dicts.
+    """
+    if type(root_files) is not list:
+        return ()
+    return tuple(
+        p
+        for item in root_files
+        if type(item) is dict and (p := item.get('path'))
+    )
+
+
+def trim_processed_repo(repo):
+    """Reduce a raw GitHub repo object to the fields the frontend uses."""
+    trimmed = _trim(repo)
+    owner = repo.get('owner')
+    if isinstance(owner, dict):
+        trimmed['owner'] = {'login': owner.get('login'), 'url': owner.get('url')}
+    return trimmed
+
+
+class GitHubRepoManager:
+    """High-level repository queries backed by the cached GitHub client."""
+
+    def __init__(self, api=None):
+        self.api = api or GitHubAPI()
+        self.file_manager = GitHubFileManager(self.api)
+        self.cache = cache_manager
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._refreshing = set()
+
+    @contextmanager
+    def _singleflight(self, cache_key):
+        """Let one caller per key do the work; the rest wait for it.
+
+        Yields True for the leader. Followers block until the leader
+        finishes (and has populated the cache), then yield False.
+        """
+        with self._inflight_lock:
+            event = self._inflight.get(cache_key)
+            if event is None:
+                event = threading.Event()
+                self._inflight[cache_key] = event
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            event.wait()
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+            event.set()
+
+    def get_repo_metadata(self, username=None, repo=None):
+        """Metadata for a single repository."""
+        username = username or self.api.username
+        endpoint = f'repos/{username}/{repo}'
+        cache_key = self.api.generate_request_cache_key('GET', endpoint)
+        # Concurrent misses for the same repo would each hit GitHub;
+        # coalesce them so followers re-read the freshly warmed cache.
+        with self._singleflight(cache_key):
+            return self.api.make_request('GET', endpoint)
+
+    def get_all_repos_metadata(self, username=None, per_page=100,
+                               include_languages=False):
+        """List all of the user's repositories, following pagination.
+
+        ``per_page`` is clamped to GitHub's maximum of 100 — larger
+        pages mean fewer requests, and smaller values only waste
+        rate-limit budget.
+        """
+        username = username or self.api.username
+        per_page = 100
+        aggregate_key = self.cache.generate_cache_key(
+            'repos_meta', username
+        )
+        repos = self.cache.get(aggregate_key)
+        if repos is None:
+            endpoint = f'users/{username}/repos'
+            first, headers = self.api.make_request(
+                'GET', endpoint,
+                params={'per_page': per_page, 'sort': 'updated', 'page': 1},
+                cache_ttl=1800, return_headers=True,
+            )
+            repos = list(first) if isinstance(first, list) else []
+            last_page = parse_last_page(headers.get('Link'))
+            if last_page and last_page > 1:
+                # Page 1's Link header reveals the page count, so the
+                # remaining pages can be fetched as one parallel wave.
+                def _fetch(page_no):
+                    return self.api.make_request(
+                        'GET', endpoint,
+                        params={'per_page': per_page, 'sort': 'updated',
+                                'page': page_no},
+                        cache_ttl=1800,
+                    )
+
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    for page in pool.map(_fetch, range(2, last_page + 1)):
+                        if isinstance(page, list):
+                            repos.extend(page)
+            elif not headers and len(repos) == per_page:
+                # Cache hit on page 1 carries no Link header; walk page
+                # numbers serially while pages keep coming back full.
+                page_no = 2
+                while True:
+                    page = self.api.make_request(
+                        'GET', endpoint,
+                        params={'per_page': per_page, 'sort': 'updated',
+                                'page': page_no},
+                        cache_ttl=1800,
+                    )
+                    if not isinstance(page, list) or not page:
+                        break
+                    repos.extend(page)
+                    if len(page) < per_page:
+                        break
+                    page_no += 1
+            if repos:
+                self.cache.save(aggregate_key, repos, ttl=1800)
+        if not isinstance(repos, list):
+            return []
+        if include_languages:
+            # Warm the local cache for every language key in one parallel
+            # sweep; a per-key blob read inside the event loop would
+            # serialize the fan-out on a cold cache.
+            lang_keys = [
+                self.api.generate_request_cache_key(
+                    'GET', f"repos/{username}/{repo.get('name')}/languages"
+                )
+                for repo in repos if isinstance(repo, dict)
+            ]
+            if lang_keys:
+                self.cache.get_many(lang_keys)
+            try:
+                asyncio.run(self._fetch_languages_async(username, repos))
+            except RuntimeError:
+                for repo in repos:
+                    if isinstance(repo, dict):
+                        repo['languages'] = self._get_repo_languages(
+                            username, repo.get('name')
+                        )
+        return repos
+
+    def _get_repo_languages(self, username, repo_name):
+        return self.api.make_request(
+            'GET', f'repos/{username}/{repo_name}/languages'
+        ) or {}
+
+    async def _fetch_languages_async(self, username, repos):
+        """Attach language stats to every repo concurrently.
+
+        Each GET goes through the cached request path, so warm entries
+        revalidate with If-None-Match and unchanged stats cost a 304
+        rather than a body transfer.
+        """
+        semaphore = asyncio.Semaphore(64)
+
+        async def _one(repo):
+            async with semaphore:
+                result = await self.api.make_request_async(
+                    'GET', f"repos/{username}/{repo.get('name')}/languages"
+                )
+            repo['languages'] = result or {}
+
+        async with self.api.async_client():
+            await asyncio.gather(
+                *(_one(repo) for repo in repos if isinstance(repo, dict))
+            )
+
+    def _serve_bundle(self, username, builder):
+        """Serve the repo bundle with stale-while-revalidate semantics.
+
+        Fresh cache entries return immediately. Expired-but-present
+        entries are served as-is while a daemon thread rebuilds the
+        bundle, so the post-TTL caller never eats the N-fetch rebuild.
+        Only a cold cache blocks on ``builder``.
+        """
+        cache_key = self.cache.generate_cache_key(
+            'bundle', 'repos_with_context', username
+        )
+        entry = self.cache.get_stale(cache_key)
+        if entry is not None:
+            data, _etag, fresh = entry
+            if not fresh:
+                self._refresh_bundle_async(cache_key, username, builder)
+            return data
+        processed = builder(username)
+        if processed:
+            self._save_bundle(cache_key, processed)
+        return processed
+
+    def _save_bundle(self, cache_key, processed):
+        """Save a bundle with a content fingerprint.
+
+        Rebuilds where no repo actually changed hash to the same value,
+        so the cache layer refreshes the expiry metadata instead of
+        re-uploading the multi-MB payload.
+        """
+        try:
+            if orjson is not None:
+                payload = orjson.dumps(
+                    processed, option=orjson.OPT_SORT_KEYS, default=list
+                )
+            else:
+                payload = json.dumps(
+                    processed, sort_keys=True, default=list
+                ).encode('utf-8')
+            fingerprint = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        except (TypeError, ValueError):
+            fingerprint = None
+        self.cache.save(cache_key, processed, ttl=3600, fingerprint=fingerprint)
+
+    def _refresh_bundle_async(self, cache_key, username, builder):
+        """Rebuild one bundle in the background, at most once at a time."""
+        with self._inflight_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def _run():
+            try:
+                processed = builder(username)
+                if processed:
+                    self._save_bundle(cache_key, processed)
+            except Exception:
+                logger.exception("Background bundle refresh failed")
+            finally:
+                with self._inflight_lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=_run, name='bundle-refresh', daemon=True).start()
+
+    def get_all_repos_with_context(self, username=None):
+        """Repositories enriched with .repo-context.json and root listing."""
+        username = username or self.api.username
+        return self._serve_bundle(username, self._build_bundle_rest)
+
+    def _build_bundle_rest(self, username):
+        """Build the enriched bundle through the REST endpoints."""
+        all_repos = self.get_all_repos_metadata(
+            username, include_languages=True
+        )
+        # Warm the local cache layer for every context/listing key in one
+        # parallel sweep so the per-repo fetches below hit memory. The
+        # async fetchers read the req/ namespace, so mirror their keys:
+        # the context file goes through the raw request path, the root
+        # listing through the JSON one.
+        prefetch_keys = []
+        for repo in all_repos:
+            if isinstance(repo, dict) and not self._skip_context_fetch(repo):
+                name = repo.get('name')
+                prefetch_keys.append(self.api.generate_request_cache_key(
+                    'GET',
+                    f'repos/{username}/{name}/contents/.repo-context.json',
+                    accept_raw=True,
+                ))
+                prefetch_keys.append(self.api.generate_request_cache_key(
+                    'GET', f'repos/{username}/{name}/contents/'
+                ))
+        if prefetch_keys:
+            self.cache.get_many(prefetch_keys)
+        try:
+            # All 2N context/listing fetches run concurrently, so the
+            # enrichment pass completes in roughly one round-trip.
+            asyncio.run(self._enhance_repos_async(username, all_repos))
+        except RuntimeError:
+            # No httpx, or already inside an event loop: fall back to
+            # threads over the pooled session, still one wave of I/O.
+            targets = [r for r in all_repos if isinstance(r, dict)]
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(
+                    lambda repo: self._enhance_repo_safe(username, repo),
+                    targets,
+                ))
+        return [
+            trim_processed_repo(repo)
+            for repo in all_repos
+            if isinstance(repo, dict)
+        ]
+
+    _REPOS_QUERY = """
+    query($login: String!, $cursor: String) {
+      user(login: $login) {
+        repositories(first: 100, after: $cursor, ownerAffiliations: OWNER) {
+          pageInfo { endCursor hasNextPage }
+          nodes {
+            databaseId name nameWithOwner description url
+            stargazerCount forkCount isFork diskUsage
+            createdAt updatedAt pushedAt
+            primaryLanguage { name }
+            languages(first: 20) { edges { size node { name } } }
+            repositoryTopics(first: 20) { nodes { topic { name } } }
+            owner { login url }
+            context: object(expression: "HEAD:.repo-context.json") {
+              ... on Blob { text }
+            }
+            root: object(expression: "HEAD:") {
+              ... on Tree { entries { path } }
+            }
+          }
+        }
+      }
+    }
+    """
+
+    def get_all_repos_with_context_graphql(self, username=None):
+        """Single-query variant of get_all_repos_with_context.
+
+        One GraphQL page carries the repo list, each repo's
+        .repo-context.json blob and its root tree, collapsing the
+        1 + 2N REST calls to one POST per 100 repositories. Falls back
+        to the REST path when GraphQL is unavailable.
+        """
+        username = username or self.api.username
+        return self._serve_bundle(username, self._build_bundle_graphql)
+
+    def _build_bundle_graphql(self, username):
+        """Build the enriched bundle via GraphQL, REST on failure."""
+        nodes = []
+        cursor = None
+        while True:
+            data = self.api.graphql(
+                self._REPOS_QUERY, {'login': username, 'cursor': cursor}
+            )
+            if data is None:
+                return self._build_bundle_rest(username)
+            page = (data.get('user') or {}).get('repositories') or {}
+            nodes.extend(page.get('nodes') or [])
+            info = page.get('pageInfo') or {}
+            if not info.get('hasNextPage'):
+                break
+            cursor = info.get('endCursor')
+        return [
+            trim_processed_repo(self._node_to_repo(node))
+            for node in nodes
+            if isinstance(node, dict)
+        ]
+
+    @staticmethod
+    def _node_to_repo(node):
+        """Reshape one GraphQL repository node into the REST repo shape."""
+        languages = {
+            edge['node']['name']: edge['size']
+            for edge in (node.get('languages') or {}).get('edges') or []
+            if isinstance(edge, dict) and edge.get('node')
+        }
+        topics = [
+            t['topic']['name']
+            for t in (node.get('repositoryTopics') or {}).get('nodes') or []
+            if isinstance(t, dict) and t.get('topic')
+        ]
+        context = node.get('context') or {}
+        root = node.get('root') or {}
+        primary = node.get('primaryLanguage') or {}
+        return {
+            'id': node.get('databaseId'),
+            'name': node.get('name'),
+            'full_name': node.get('nameWithOwner'),
+            'description': node.get('description'),
+            'html_url': node.get('url'),
+            'language': primary.get('name'),
+            'languages': languages,
+            'stargazers_count': node.get('stargazerCount'),
+            'forks_count': node.get('forkCount'),
+            'topics': topics,
+            'created_at': node.get('createdAt'),
+            'updated_at': node.get('updatedAt'),
+            'pushed_at': node.get('pushedAt'),
+            'size': node.get('diskUsage'),
+            'fork': node.get('isFork'),
+            'owner': node.get('owner') or {},
+            'repoContext': (
+                _parse_context(context['text']) if context.get('text') else {}
+            ),
+            'file_paths': tuple(
+                entry['path']
+                for entry in root.get('entries') or []
+                if isinstance(entry, dict) and 'path' in entry
+            ),
+        }
+
+    async def _enhance_repos_async(self, username, repos):
+        """Attach repoContext and file_paths to every repo concurrently."""
+        semaphore = asyncio.Semaphore(64)
+        async with self.api.async_client():
+            await asyncio.gather(
+                *(
+                    self._afetch_context(semaphore, username, repo)
+                    for repo in repos
+                    if isinstance(repo, dict)
+                )
+            )
+
+    @staticmethod
+    def _skip_context_fetch(repo):
+        """Forks without topics are mirrors; they never carry a context file."""
+        return bool(repo.get('fork')) and not repo.get('topics')
+
+    async def _afetch_context(self, semaphore, username, repo):
+        """Fetch one repo's context file and root listing in parallel."""
+        if self._skip_context_fetch(repo):
+            repo['repoContext'] = {}
+            repo['file_paths'] = ()
+            return
+        repo_name = repo.get('name')
+        async with semaphore:
+            repo_context, root_files = await asyncio.gather(
+                self.file_manager.get_file_content_async(
+                    username, repo_name, '.repo-context.json', raw=True
+                ),
+                self.file_manager.get_file_content_async(
+                    username, repo_name, ''
+                ),
+            )
+        repo['repoContext'] = (
+            _parse_context(repo_context) if repo_context else {}
+        )
+        repo['file_paths'] = _extract_file_paths(root_files)
+
+    def _enhance_repo_safe(self, username, repo):
+        """Enrich one repo, containing failures so a batch never tanks."""
+        try:
+            self._enhance_repo(username, repo)
+        except Exception as e:
+            logger.warning(
+                f"Context enrichment failed for {repo.get('name')}: {e}"
+            )
+            repo.setdefault('repoContext', {})
+            repo.setdefault('file_paths', ())
+
+    def _enhance_repo(self, username, repo):
+        """Enrich one repo with its context file and root listing."""
+        if self._skip_context_fetch(repo):
+            repo['repoContext'] = {}
+            repo['file_paths'] = ()
+            return
+        repo_name = repo.get('name')
+        repo_context = self.file_manager.get_file_content(
+            username, repo_name, '.repo-context.json', raw=True
+        )
+        repo['repoContext'] = (
+            _parse_context(repo_context) if repo_context else {}
+        )
+        root_files = self.file_manager.get_file_content(username, repo_name, '')
+        repo['file_paths'] = _extract_file_paths(root_files)
@@ -0,0 +1,10 @@
+"""Make the function-app modules importable from the test directory.
+
+The app uses flat imports (``from cache_manager import cache_manager``),
+so the api/ directory itself has to be on sys.path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,213 @@
+"""Tests for the pure-Python parts of cache_manager.
+
+Everything here runs without a storage account: the manager is built
+with no ``AzureWebJobsStorage`` configured, so the blob layer stays
+disabled and only the in-process machinery is exercised.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache_manager import (
+    NEGATIVE_TTL,
+    CacheManager,
+    _iso_timestamp,
+    _LocalCache,
+    _NEGATIVE,
+)
+
+
+class _InlinePool:
+    """Executes submitted work synchronously, for deterministic asserts."""
+
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.delenv('AzureWebJobsStorage', raising=False)
+    return CacheManager()
+
+
+class TestLocalCache:
+    def test_set_then_get(self):
+        cache = _LocalCache()
+        cache.set('a', {'v': 1})
+        assert cache.get('a') == {'v': 1}
+
+    def test_miss_returns_none(self):
+        assert _LocalCache().get('absent') is None
+
+    def test_expired_entry_is_dropped(self):
+        cache = _LocalCache(ttl=-1)
+        cache.set('a', 1)
+        assert cache.get('a') is None
+        # The expired read evicts; even a stale read finds nothing now.
+        assert cache.get_stale('a') is None
+
+    def test_get_stale_survives_expiry(self):
+        cache = _LocalCache(ttl=-1)
+        cache.set('a', 1)
+        assert cache.get_stale('a') == 1
+
+    def test_eviction_drops_coldest_batch(self):
+        cache = _LocalCache(maxsize=10)
+        for i in range(10):
+            cache.set(f'k{i}', i)
+        cache.get('k0')  # touch so k0 becomes the warmest
+        cache.set('k10', 10)
+        assert cache.get('k0') == 0
+        assert cache.get('k1') is None  # coldest entry went first
+        assert cache.get('k10') == 10
+
+    def test_pop_removes_entry(self):
+        cache = _LocalCache()
+        cache.set('a', 1)
+        cache.pop('a')
+        assert cache.get('a') is None
+
+    def test_pop_missing_is_noop(self):
+        _LocalCache().pop('absent')
+
+
+class TestIsExpired:
+    def test_epoch_in_past(self):
+        now = int(time.time())
+        assert CacheManager._is_expired({'expires_at_epoch': str(now - 1)}, now)
+
+    def test_epoch_in_future(self):
+        now = int(time.time())
+        metadata = {'expires_at_epoch': str(now + 60)}
+        assert not CacheManager._is_expired(metadata, now)
+
+    def test_bad_epoch_falls_back_to_iso(self):
+        now = int(time.time())
+        past = (datetime.now() - timedelta(seconds=5)).isoformat()
+        metadata = {'expires_at_epoch': 'garbage', 'expires_at': past}
+        assert CacheManager._is_expired(metadata, now)
+
+    def test_legacy_iso_only(self):
+        now = int(time.time())
+        future = (datetime.now() + timedelta(seconds=60)).isoformat()
+        assert not CacheManager._is_expired({'expires_at': future}, now)
+
+    def test_no_expiry_metadata_means_not_expired(self):
+        assert not CacheManager._is_expired({}, int(time.time()))
+
+
+class TestGenerateCacheKey:
+    def test_joins_with_slashes(self, manager):
+        assert manager.generate_cache_key('file_content', 'u', 'r', 'p') == (
+            'file_content/u/r/p'
+        )
+
+    def test_unsafe_characters_are_translated(self, manager):
+        key = manager.generate_cache_key('prefix', 'a/b', 'c:d e')
+        assert key == 'prefix/a_b/c_d_e'
+
+
+class TestIsoTimestamp:
+    def test_none_passes_through(self):
+        assert _iso_timestamp(None) is None
+
+    def test_epoch_and_datetime_share_one_shape(self):
+        moment = datetime(2026, 1, 2, 3, 4, 5)
+        assert _iso_timestamp(moment) == moment.isoformat()
+        assert _iso_timestamp(int(moment.timestamp())) == moment.isoformat()
+
+
+class TestCacheDecorator:
+    def test_result_is_returned_and_saved(self, manager):
+        manager._save_pool = _InlinePool()
+        saved = {}
+        manager.save = lambda key, data, **kw: saved.update({key: data})
+
+        @manager.cache_decorator(lambda x: f'test/{x}', ttl=60)
+        def compute(x):
+            return x * 2
+
+        assert compute(21) == 42
+        assert saved == {'test/21': 42}
+
+    def test_fresh_hit_short_circuits(self, manager):
+        manager.get = lambda key: {'cached': True}
+        calls = []
+
+        @manager.cache_decorator(lambda x: f'test/{x}')
+        def compute(x):
+            calls.append(x)
+
+        assert compute(1) == {'cached': True}
+        assert calls == []
+
+    def test_none_is_not_saved_by_default(self, manager):
+        manager._save_pool = _InlinePool()
+        saved = {}
+        manager.save = lambda key, data, **kw: saved.update({key: data})
+
+        @manager.cache_decorator(lambda x: f'test/{x}')
+        def compute(x):
+            return None
+
+        assert compute(1) is None
+        assert saved == {}
+
+    def test_negative_saved_under_sentinel(self, manager):
+        manager._save_pool = _InlinePool()
+        saved = {}
+
+        def fake_save(key, data, ttl=None, **kw):
+            saved[key] = (data, ttl)
+
+        manager.save = fake_save
+
+        @manager.cache_decorator(lambda x: f'test/{x}', cache_none=True)
+        def compute(x):
+            return None
+
+        assert compute(1) is None
+        assert saved == {'test/1': (_NEGATIVE, NEGATIVE_TTL)}
+
+    def test_cached_negative_unwraps_to_none(self, manager):
+        manager.get = lambda key: dict(_NEGATIVE)
+        calls = []
+
+        @manager.cache_decorator(lambda x: f'test/{x}', cache_none=True)
+        def compute(x):
+            calls.append(x)
+            return {'real': True}
+
+        assert compute(1) is None
+        assert calls == []
+
+    def test_concurrent_misses_coalesce(self, manager):
+        entered = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        @manager.cache_decorator(lambda: 'test/shared')
+        def compute():
+            calls.append(1)
+            entered.set()
+            release.wait(timeout=5)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(compute()))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        assert entered.wait(timeout=5)
+        # Give the followers time to park on the leader's event.
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        assert results == ['value'] * 5
+        assert len(calls) == 1
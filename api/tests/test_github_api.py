@@ -0,0 +1,90 @@
+"""Tests for the request-key and Link-header helpers in github_api."""
+
+import pytest
+
+from github_api import GitHubAPI, parse_last_page, parse_next_link
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    return GitHubAPI()
+
+
+class TestGenerateRequestCacheKey:
+    def test_shape(self, api):
+        key = api.generate_request_cache_key('get', 'repos/u/r')
+        method, prefix = 'GET', 'req'
+        assert key.startswith(f'{prefix}/{method}/')
+        assert len(key.rsplit('/', 1)[1]) == 16  # blake2b-8 hex
+
+    def test_same_request_same_key(self, api):
+        first = api.generate_request_cache_key('GET', 'repos/u/r', {'page': 1})
+        second = api.generate_request_cache_key('GET', 'repos/u/r', {'page': 1})
+        assert first == second
+
+    def test_param_order_cannot_split_the_cache(self, api):
+        first = api.generate_request_cache_key(
+            'GET', 'repos/u/r', {'page': 1, 'per_page': 100}
+        )
+        second = api.generate_request_cache_key(
+            'GET', 'repos/u/r', {'per_page': 100, 'page': 1}
+        )
+        assert first == second
+
+    def test_different_params_different_keys(self, api):
+        first = api.generate_request_cache_key('GET', 'repos/u/r', {'page': 1})
+        second = api.generate_request_cache_key('GET', 'repos/u/r', {'page': 2})
+        assert first != second
+
+    def test_accept_variant_separates_entries(self, api):
+        endpoint = 'repos/u/r/contents/README.md'
+        plain = api.generate_request_cache_key('GET', endpoint)
+        raw = api.generate_request_cache_key('GET', endpoint, accept_raw=True)
+        assert plain != raw
+
+    def test_unhashable_params_still_keyed(self, api):
+        # List values defeat the lru_cache memoization but must still
+        # produce a stable, canonical key through the direct path.
+        first = api.generate_request_cache_key(
+            'GET', 'repos/u/r', {'labels': ['a', 'b'], 'page': 1}
+        )
+        second = api.generate_request_cache_key(
+            'GET', 'repos/u/r', {'page': 1, 'labels': ['a', 'b']}
+        )
+        assert first == second
+        assert first.startswith('req/GET/')
+
+
+LINK_HEADER = (
+    '<https://api.github.com/user/repos?page=3&per_page=100>; rel="next", '
+    '<https://api.github.com/user/repos?page=50&per_page=100>; rel="last"'
+)
+
+
+class TestParseNextLink:
+    def test_extracts_next_url(self):
+        assert parse_next_link(LINK_HEADER) == (
+            'https://api.github.com/user/repos?page=3&per_page=100'
+        )
+
+    def test_no_next_rel(self):
+        header = '<https://api.github.com/user/repos?page=1>; rel="prev"'
+        assert parse_next_link(header) is None
+
+    def test_empty_header(self):
+        assert parse_next_link(None) is None
+        assert parse_next_link('') is None
+
+
+class TestParseLastPage:
+    def test_extracts_last_page(self):
+        assert parse_last_page(LINK_HEADER) == 50
+
+    def test_no_last_rel(self):
+        header = '<https://api.github.com/user/repos?page=3>; rel="next"'
+        assert parse_last_page(header) is None
+
+    def test_empty_header(self):
+        assert parse_last_page(None) is None
+        assert parse_last_page('') is None
@@ -0,0 +1,80 @@
+"""Tests for the pure transformation helpers in github_repo_manager."""
+
+from github_repo_manager import (
+    _KEYS_TO_KEEP,
+    _compile_trimmer,
+    _extract_file_paths,
+    _parse_context,
+    trim_processed_repo,
+)
+
+RAW_REPO = {
+    'id': 1,
+    'name': 'portfolio',
+    'full_name': 'u/portfolio',
+    'description': 'demo',
+    'language': 'Python',
+    'stargazers_count': 3,
+    'topics': ['azure'],
+    'fork': False,
+    'owner': {'login': 'u', 'url': 'https://api.github.com/users/u',
+              'gravatar_id': '', 'site_admin': False},
+    # Fields the frontend never reads:
+    'node_id': 'MDEw',
+    'ssh_url': 'git@github.com:u/portfolio.git',
+    'permissions': {'admin': True},
+}
+
+
+class TestTrimProcessedRepo:
+    def test_keeps_only_wanted_keys(self):
+        trimmed = trim_processed_repo(RAW_REPO)
+        assert set(trimmed) <= _KEYS_TO_KEEP | {'owner'}
+        assert 'ssh_url' not in trimmed
+        assert trimmed['name'] == 'portfolio'
+
+    def test_missing_keys_are_omitted(self):
+        trimmed = trim_processed_repo({'name': 'x'})
+        assert trimmed == {'name': 'x'}
+
+    def test_owner_is_reduced(self):
+        trimmed = trim_processed_repo(RAW_REPO)
+        assert trimmed['owner'] == {
+            'login': 'u', 'url': 'https://api.github.com/users/u'
+        }
+
+    def test_no_owner_no_owner_key(self):
+        assert 'owner' not in trim_processed_repo({'name': 'x'})
+
+    def test_compiled_trimmer_matches_reference(self):
+        trim = _compile_trimmer()
+        reference = {
+            key: value for key, value in RAW_REPO.items()
+            if key in _KEYS_TO_KEEP
+        }
+        assert trim(RAW_REPO) == reference
+
+
+class TestExtractFilePaths:
+    def test_extracts_paths_as_tuple(self):
+        listing = [{'path': 'README.md'}, {'path': 'src'}]
+        assert _extract_file_paths(listing) == ('README.md', 'src')
+
+    def test_non_list_input(self):
+        assert _extract_file_paths(None) == ()
+        assert _extract_file_paths({'path': 'x'}) == ()
+
+    def test_entries_without_path_are_skipped(self):
+        listing = [{'path': 'a'}, {'name': 'no-path'}, 'junk', {'path': ''}]
+        assert _extract_file_paths(listing) == ('a',)
+
+
+class TestParseContext:
+    def test_valid_json(self):
+        assert _parse_context('{"type": "project"}') == {'type': 'project'}
+
+    def test_bytes_input(self):
+        assert _parse_context(b'{"a": 1}') == {'a': 1}
+
+    def test_bad_json_returns_empty(self):
+        assert _parse_context('not json') == {}